@@ -1,6 +1,6 @@
 import json
 import pathlib
-from typing import cast
+from typing import cast, Optional
 
 import click
 import click_pathlib
@@ -12,6 +12,9 @@ from isic_challenge_scoring.types import ScoreException
 
 DirectoryPath = click_pathlib.Path(exists=True, file_okay=False, dir_okay=True, readable=True)
 FilePath = click_pathlib.Path(exists=True, file_okay=True, dir_okay=False, readable=True)
+WritableDirectoryPath = click_pathlib.Path(
+    exists=True, file_okay=False, dir_okay=True, readable=True, writable=True
+)
 
 
 @click.group(name='isic-challenge-scoring', help='ISIC Challenge submission scoring')
@@ -24,9 +27,29 @@ def cli(output: str) -> None:
 @click.pass_context
 @click.argument('truth_dir', type=DirectoryPath)
 @click.argument('prediction_dir', type=DirectoryPath)
-def segmentation(ctx: click.Context, truth_dir: pathlib.Path, prediction_dir: pathlib.Path) -> None:
+@click.option(
+    '--cache-dir',
+    type=WritableDirectoryPath,
+    help='Directory in which to cache decoded ground truth images, for faster repeated scoring.',
+)
+@click.option(
+    '--max-workers',
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help='Number of processes in which to load images in parallel; 0 uses all available CPUs.',
+)
+def segmentation(
+    ctx: click.Context,
+    truth_dir: pathlib.Path,
+    prediction_dir: pathlib.Path,
+    cache_dir: Optional[pathlib.Path],
+    max_workers: int,
+) -> None:
     try:
-        score = SegmentationScore.from_dir(truth_dir, prediction_dir)
+        score = SegmentationScore.from_dir(
+            truth_dir, prediction_dir, cache_dir, max_workers if max_workers else None
+        )
     except ScoreException as e:
         raise click.ClickException(str(e))
 
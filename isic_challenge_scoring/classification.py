@@ -4,10 +4,11 @@ from dataclasses import dataclass
 import pathlib
 from typing import cast, Dict, TextIO
 
+import numpy as np
 import pandas as pd
 
 from isic_challenge_scoring import metrics
-from isic_challenge_scoring.confusion import create_binary_confusion_matrix
+from isic_challenge_scoring.confusion import create_binary_confusion_matrices
 from isic_challenge_scoring.load_csv import parse_csv, parse_truth_csv, sort_rows, validate_rows
 from isic_challenge_scoring.types import DataFrameDict, RocDict, Score, ScoreDict, SeriesDict
 
@@ -27,15 +28,29 @@ class ClassificationScore(Score):
     ) -> None:
         categories = truth_probabilities.columns
 
+        # Extract NumPy arrays once, so per-category metrics can operate on plain array columns,
+        # without the overhead of pandas indexing
+        truth_values = truth_probabilities.to_numpy()
+        prediction_values = prediction_probabilities[categories].to_numpy()
+        score_weights = truth_weights.score_weight.to_numpy()
+
+        # Compute the binary confusion matrices of all categories at once
+        category_cms = create_binary_confusion_matrices(
+            truth_binary_values=truth_values > 0.5,
+            prediction_binary_values=prediction_values > 0.5,
+            weights=score_weights,
+            names=categories,
+        )
+
         self.per_category = pd.DataFrame(
             [
                 self._category_score(
-                    truth_probabilities[category],
-                    prediction_probabilities[category],
-                    truth_weights,
-                    category,
+                    category_cms.loc[category],
+                    truth_values[:, category_index],
+                    prediction_values[:, category_index],
+                    score_weights,
                 )
-                for category in categories
+                for category_index, category in enumerate(categories)
             ]
         )
         self.macro_average = self.per_category.mean(axis='index').rename(
@@ -43,11 +58,11 @@ class ClassificationScore(Score):
         )
         self.rocs = {
             category: metrics.roc(
-                truth_probabilities[category],
-                prediction_probabilities[category],
-                truth_weights.score_weight,
+                truth_values[:, category_index],
+                prediction_values[:, category_index],
+                score_weights,
             )
-            for category in categories
+            for category_index, category in enumerate(categories)
         }
         # Multi-category aggregate metrics
         self.aggregate = pd.Series(
@@ -67,19 +82,16 @@ class ClassificationScore(Score):
 
     @staticmethod
     def _category_score(
-        truth_category_probabilities: pd.Series,
-        prediction_category_probabilities: pd.Series,
-        truth_weights: pd.DataFrame,
-        category: str,
+        category_cm: pd.Series,
+        truth_category_probabilities: np.ndarray,
+        prediction_category_probabilities: np.ndarray,
+        score_weights: np.ndarray,
     ) -> pd.Series:
-        truth_binary_values: pd.Series = truth_category_probabilities.gt(0.5)
-        prediction_binary_values: pd.Series = prediction_category_probabilities.gt(0.5)
-
-        category_cm = create_binary_confusion_matrix(
-            truth_binary_values=truth_binary_values.to_numpy(),
-            prediction_binary_values=prediction_binary_values.to_numpy(),
-            weights=truth_weights.score_weight.to_numpy(),
-            name=category,
+        auc, auc_sens_80 = metrics.auc_and_auc_above_sensitivity(
+            truth_category_probabilities,
+            prediction_category_probabilities,
+            score_weights,
+            0.80,
         )
 
         return pd.Series(
@@ -90,21 +102,12 @@ class ClassificationScore(Score):
                 'dice': metrics.binary_dice(category_cm),
                 'ppv': metrics.binary_ppv(category_cm),
                 'npv': metrics.binary_npv(category_cm),
-                'auc': metrics.auc(
-                    truth_category_probabilities,
-                    prediction_category_probabilities,
-                    truth_weights.score_weight,
-                ),
-                'auc_sens_80': metrics.auc_above_sensitivity(
-                    truth_category_probabilities,
-                    prediction_category_probabilities,
-                    truth_weights.score_weight,
-                    0.80,
-                ),
+                'auc': auc,
+                'auc_sens_80': auc_sens_80,
                 'ap': metrics.average_precision(
                     truth_category_probabilities,
                     prediction_category_probabilities,
-                    truth_weights.score_weight,
+                    score_weights,
                 ),
             },
             index=[
@@ -118,7 +121,7 @@ class ClassificationScore(Score):
                 'auc_sens_80',
                 'ap',
             ],
-            name=category,
+            name=category_cm.name,
         )
 
     def to_string(self) -> str:
@@ -3,6 +3,85 @@ from typing import Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+if numba is not None:
+
+    # Caching the compiled kernel on disk avoids recompiling it on every run
+    @numba.njit(cache=True, parallel=True)
+    def _count_positives_kernel(
+        truth_values: np.ndarray, prediction_values: np.ndarray, threshold: int
+    ) -> Tuple[int, int, int]:
+        true_positive = 0
+        truth_positive = 0
+        prediction_positive = 0
+        # Each value is read and thresholded only once, and the accumulators are reduced across
+        # threads
+        for i in numba.prange(truth_values.size):
+            truth_value = truth_values[i] > threshold
+            prediction_value = prediction_values[i] > threshold
+            true_positive += truth_value & prediction_value
+            truth_positive += truth_value
+            prediction_positive += prediction_value
+        return true_positive, truth_positive, prediction_positive
+
+
+def _count_positives(
+    truth_values: np.ndarray, prediction_values: np.ndarray, threshold: Optional[int] = None
+) -> Tuple[int, int, int]:
+    """
+    Count the true positives, truth positives, and prediction positives of 1-D values.
+
+    If threshold is provided, values greater than it are positive; otherwise, the values must
+    already be binary.
+    """
+    if numba is not None:
+        if threshold is None:
+            truth_values = truth_values.astype(np.bool_, copy=False)
+            prediction_values = prediction_values.astype(np.bool_, copy=False)
+        true_positive, truth_positive, prediction_positive = _count_positives_kernel(
+            np.ascontiguousarray(truth_values),
+            np.ascontiguousarray(prediction_values),
+            0 if threshold is None else threshold,
+        )
+        return int(true_positive), int(truth_positive), int(prediction_positive)
+
+    if threshold is not None:
+        truth_values = truth_values > threshold
+        prediction_values = prediction_values > threshold
+
+    # np.count_nonzero is vectorized, and counts any non-zero (e.g. float) value as positive
+    true_positive = np.count_nonzero(np.logical_and(truth_values, prediction_values))
+    truth_positive = np.count_nonzero(truth_values)
+    prediction_positive = np.count_nonzero(prediction_values)
+
+    return true_positive, truth_positive, prediction_positive
+
+
+def _derive_confusion_matrix(
+    true_positive: float,
+    truth_positive: float,
+    prediction_positive: float,
+    total: float,
+    name: Optional[Union[str, Tuple[str, ...]]],
+) -> pd.Series:
+    false_positive = prediction_positive - true_positive
+    false_negative = truth_positive - true_positive
+    true_negative = total - true_positive - false_positive - false_negative
+
+    # Storing the matrix as a Series instead of a DataFrame makes it easier to reference elements
+    # and aggregate multiple matrices
+    cm = pd.Series(
+        {'TP': true_positive, 'TN': true_negative, 'FP': false_positive, 'FN': false_negative},
+        name=name,
+    )
+
+    return cm
+
 
 def create_binary_confusion_matrix(
     truth_binary_values: np.ndarray,
@@ -16,36 +95,82 @@ def create_binary_confusion_matrix(
     # ~6x faster than pandas.crosstab
     truth_binary_values = truth_binary_values.ravel()
     prediction_binary_values = prediction_binary_values.ravel()
-    if weights is not None:
+
+    # Only the true positives and the positive totals require a pass over the values; the
+    # remaining cells are derived from them algebraically, which avoids allocating and summing
+    # the negated and intersected arrays of each cell
+    if weights is None:
+        true_positive, truth_positive, prediction_positive = _count_positives(
+            truth_binary_values, prediction_binary_values
+        )
+        total = truth_binary_values.size
+    else:
         weights = weights.ravel()
+        true_positives = np.logical_and(truth_binary_values, prediction_binary_values)
+        # Weighted counts are dot products, which are computed by BLAS
+        true_positive = np.dot(weights, true_positives)
+        truth_positive = np.dot(weights, truth_binary_values)
+        prediction_positive = np.dot(weights, prediction_binary_values)
+        total = np.sum(weights)
 
-    truth_binary_negative_values = 1 - truth_binary_values
-    test_binary_negative_values = 1 - prediction_binary_values
+    return _derive_confusion_matrix(true_positive, truth_positive, prediction_positive, total, name)
 
-    true_positives = np.logical_and(truth_binary_values, prediction_binary_values)
-    true_negatives = np.logical_and(truth_binary_negative_values, test_binary_negative_values)
-    false_positives = np.logical_and(truth_binary_negative_values, prediction_binary_values)
-    false_negatives = np.logical_and(truth_binary_values, test_binary_negative_values)
 
-    if weights is not None:
-        true_positives = true_positives * weights
-        true_negatives = true_negatives * weights
-        false_positives = false_positives * weights
-        false_negatives = false_negatives * weights
+def create_thresholded_confusion_matrix(
+    truth_values: np.ndarray,
+    prediction_values: np.ndarray,
+    threshold: int,
+    name: Optional[Union[str, Tuple[str, ...]]] = None,
+) -> pd.Series:
+    """
+    Create a binary confusion matrix, where values greater than threshold are positive.
 
-    true_positive = np.sum(true_positives)
-    true_negative = np.sum(true_negatives)
-    false_positive = np.sum(false_positives)
-    false_negative = np.sum(false_negatives)
+    When Numba is available, the thresholding is fused with the counting, so full-size binary
+    copies of the values are never allocated.
+    """
+    true_positive, truth_positive, prediction_positive = _count_positives(
+        truth_values.ravel(), prediction_values.ravel(), threshold
+    )
+    return _derive_confusion_matrix(
+        true_positive, truth_positive, prediction_positive, truth_values.size, name
+    )
 
-    # Storing the matrix as a Series instead of a DataFrame makes it easier to reference elements
-    # and aggregate multiple matrices
-    cm = pd.Series(
+
+def create_binary_confusion_matrices(
+    truth_binary_values: np.ndarray,
+    prediction_binary_values: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    names: Optional[pd.Index] = None,
+) -> pd.DataFrame:
+    """
+    Create a binary confusion matrix for each column of 2-D values.
+
+    All columns are reduced at once, and each confusion matrix is returned as a row.
+    """
+    true_positives = np.logical_and(truth_binary_values, prediction_binary_values)
+    if weights is None:
+        true_positive = np.count_nonzero(true_positives, axis=0)
+        truth_positive = np.count_nonzero(truth_binary_values, axis=0)
+        prediction_positive = np.count_nonzero(prediction_binary_values, axis=0)
+        total = truth_binary_values.shape[0]
+    else:
+        # Weighted counts are vector-matrix products, which are computed by BLAS
+        true_positive = np.dot(weights, true_positives)
+        truth_positive = np.dot(weights, truth_binary_values)
+        prediction_positive = np.dot(weights, prediction_binary_values)
+        total = np.sum(weights)
+
+    false_positive = prediction_positive - true_positive
+    false_negative = truth_positive - true_positive
+    true_negative = total - true_positive - false_positive - false_negative
+
+    cms = pd.DataFrame(
         {'TP': true_positive, 'TN': true_negative, 'FP': false_positive, 'FN': false_negative},
-        name=name,
+        index=names,
+        columns=['TP', 'TN', 'FP', 'FN'],
     )
 
-    return cm
+    return cms
 
 
 def normalize_confusion_matrix(cm: pd.Series) -> pd.Series:
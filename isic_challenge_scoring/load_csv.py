@@ -73,22 +73,24 @@ def parse_csv(csv_file_stream: TextIO, categories: pd.Index) -> pd.DataFrame:
     # sort by the order in categories
     probabilities = probabilities.reindex(categories, axis='columns')
 
-    missing_rows = probabilities[probabilities.isnull().any(axis='columns')].index
-    if not missing_rows.empty:
-        raise ScoreException(f'Missing value(s) in CSV for images: {missing_rows.tolist()}.')
-
-    non_float_columns = probabilities.dtypes[
-        probabilities.dtypes.apply(lambda x: x != np.float64)
-    ].index
+    non_float_columns = probabilities.columns[probabilities.dtypes != np.float64]
     if not non_float_columns.empty:
         raise ScoreException(
             f'CSV contains non-floating-point value(s) in columns: {non_float_columns.tolist()}.'
         )
     # TODO: identify specific failed rows
 
-    out_of_range_rows = probabilities[
-        probabilities.applymap(lambda x: x < 0.0 or x > 1.0).any(axis='columns')
-    ].index
+    # All columns are now known to be floating-point, so both remaining checks can share a single
+    # contiguous NumPy array
+    probability_values = probabilities.to_numpy()
+
+    missing_rows = probabilities.index[np.isnan(probability_values).any(axis=1)]
+    if not missing_rows.empty:
+        raise ScoreException(f'Missing value(s) in CSV for images: {missing_rows.tolist()}.')
+
+    out_of_range_rows = probabilities.index[
+        np.logical_or(probability_values < 0.0, probability_values > 1.0).any(axis=1)
+    ]
     if not out_of_range_rows.empty:
         raise ScoreException(
             f'Values in CSV are outside the interval [0.0, 1.0] for images: '
@@ -109,6 +111,11 @@ def validate_rows(
     Fail when predictionProbabilities is missing rows or has extra rows compared to
     truthProbabilities.
     """
+    if truth_probabilities.index.equals(prediction_probabilities.index):
+        # Avoid computing set differences in the common case of identical rows; the differences
+        # are only needed to report which rows are wrong
+        return
+
     missing_images = truth_probabilities.index.difference(prediction_probabilities.index)
     if not missing_images.empty:
         raise ScoreException(f'Missing images in CSV: {missing_images.tolist()}.')
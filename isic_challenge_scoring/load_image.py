@@ -1,13 +1,27 @@
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
+import hashlib
+import multiprocessing
+import os
 import pathlib
 import re
-from typing import Generator, Match, Optional, Set
+import tempfile
+from typing import Deque, Dict, Generator, List, Match, Optional
 
 import numpy as np
 from PIL import Image, UnidentifiedImageError
 
 from isic_challenge_scoring.types import ScoreException
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Maps image numbers to the prediction files with names containing them
+PredictionFileIndex = Dict[str, List[pathlib.Path]]
+
 
 @dataclass
 class ImagePair:
@@ -30,21 +44,15 @@ class ImagePair:
         if attribute_id_match:
             self.attribute_id = attribute_id_match.group(1)
 
-    def find_prediction_file(self, prediction_path: pathlib.Path) -> None:
+    def find_prediction_file(self, prediction_file_index: PredictionFileIndex) -> None:
         image_number: str = self.image_id.split('_')[1]
 
-        if not self.attribute_id:
-            prediction_file_candidates = [
-                prediction_file
-                for prediction_file in prediction_path.iterdir()
-                if image_number in prediction_file.stem
-            ]
-        else:
+        prediction_file_candidates = prediction_file_index.get(image_number, [])
+        if self.attribute_id:
             prediction_file_candidates = [
                 prediction_file
-                for prediction_file in prediction_path.iterdir()
-                if image_number in prediction_file.stem
-                and self.attribute_id in prediction_file.stem
+                for prediction_file in prediction_file_candidates
+                if self.attribute_id in prediction_file.stem
             ]
 
         if not prediction_file_candidates:
@@ -54,8 +62,11 @@ class ImagePair:
 
         self.prediction_file = prediction_file_candidates[0]
 
-    def load_truth_image(self) -> None:
-        self.truth_image = load_segmentation_image(self.truth_file)
+    def load_truth_image(self, cache_path: Optional[pathlib.Path] = None) -> None:
+        if cache_path is None:
+            self.truth_image = load_segmentation_image(self.truth_file)
+        else:
+            self.truth_image = load_cached_segmentation_image(self.truth_file, cache_path)
         # TODO: Validate all ground truth as binary before upload
         # self.truth_image = assert_binary_image(self.truth_image, self.truth_file)
 
@@ -70,6 +81,13 @@ class ImagePair:
 
 def load_segmentation_image(image_path: pathlib.Path) -> np.ndarray:
     """Load a segmentation image as a NumPy array, given a file path."""
+    if cv2 is not None:
+        # OpenCV decodes directly to a NumPy array, and is faster than PIL; any image which it
+        # can't decode as single-channel 8-bit is left to PIL, to be validated consistently
+        np_image = cv2.imread(str(image_path), cv2.IMREAD_UNCHANGED)
+        if np_image is not None and np_image.ndim == 2 and np_image.dtype == np.uint8:
+            return np_image
+
     try:
         with Image.open(image_path) as image:
             # Ensure the image is loaded, sometimes NumPy fails to get the "__array_interface__"
@@ -91,36 +109,141 @@ def load_segmentation_image(image_path: pathlib.Path) -> np.ndarray:
     return np_image
 
 
+def load_cached_segmentation_image(
+    image_path: pathlib.Path, cache_path: pathlib.Path
+) -> np.ndarray:
+    """
+    Load a segmentation image as a NumPy array, given a file path and a cache directory.
+
+    Decoded images are stored as .npy files in the cache directory, so subsequent loads of the
+    same image skip decoding it.
+    """
+    # Key cache entries by the encoded image content, so they can never become stale
+    image_digest = hashlib.sha256(image_path.read_bytes()).hexdigest()
+    cached_image_path = cache_path / f'{image_digest}.npy'
+
+    try:
+        return np.load(cached_image_path)
+    except (OSError, EOFError, ValueError):
+        # A missing, unreadable, or corrupt cache entry is (re)written below
+        pass
+
+    np_image = load_segmentation_image(image_path)
+
+    # Write to a temporary file first, so concurrent readers never see a partial cache entry
+    temp_file = tempfile.NamedTemporaryFile(dir=cache_path, suffix='.npy', delete=False)
+    try:
+        with temp_file:
+            np.save(temp_file, np_image)
+        # Temporary files are only accessible by their owner, so apply the permissions of a newly
+        # created file, allowing the cache directory to be shared
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_file.name, 0o666 & ~umask)
+        os.replace(temp_file.name, cached_image_path)
+    except BaseException:
+        pathlib.Path(temp_file.name).unlink()
+        raise
+
+    return np_image
+
+
 def assert_binary_image(image: np.ndarray, image_path: pathlib.Path) -> np.ndarray:
     """Ensure a NumPy array image is binary, correcting if possible."""
-    image_values: Set[int] = set(np.unique(image))
-    if image_values <= {0, 255}:
+    # Finding the high value and checking for any other values is much cheaper than sorting all
+    # values with np.unique
+    high_value = image.max()
+    if np.any(np.logical_and(image != 0, image != high_value)):
+        raise ScoreException(f'Image {image_path.name} contains values other than 0 and 255.')
+
+    if high_value in {0, 255}:
         # Expected values
         pass
-    elif len(image_values) <= 2:
-        # Binary image with high value other than 255 can be corrected
-        high_value = (image_values - {0}).pop()
-        image /= high_value
-        image *= 255
-        if set(np.unique(image)) > {0, 255}:
-            raise ScoreException(f'Image {image_path.name} contains values other than 0 and 255.')
     else:
-        raise ScoreException(f'Image {image_path.name} contains values other than 0 and 255.')
+        # Binary image with high value other than 255 can be corrected; since it's already known
+        # to contain only 0 and high_value, this is just a threshold at 0, which (unlike in-place
+        # division) is valid for integer arrays and avoids any floating-point conversion
+        image = np.multiply(image != 0, 255, dtype=np.uint8)
 
     return image
 
 
+def index_prediction_files(prediction_path: pathlib.Path) -> PredictionFileIndex:
+    """Index all prediction files by the image numbers which their names could contain."""
+    prediction_file_index: PredictionFileIndex = defaultdict(list)
+    for prediction_file in prediction_path.iterdir():
+        # An image number may be any 7 consecutive digits of a run of digits within the name
+        image_numbers = {
+            digits[start : start + 7]
+            for digits in re.findall(r'[0-9]{7,}', prediction_file.stem)
+            for start in range(len(digits) - 6)
+        }
+        for image_number in image_numbers:
+            prediction_file_index[image_number].append(prediction_file)
+    return prediction_file_index
+
+
+def _load_image_pair(image_pair: ImagePair, cache_path: Optional[pathlib.Path]) -> ImagePair:
+    image_pair.load_truth_image(cache_path)
+    image_pair.load_prediction_image()
+    return image_pair
+
+
+def _available_cpu_count() -> int:
+    # Unlike os.cpu_count, this respects any restriction of the CPUs this process may run on
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 def iter_image_pairs(
-    truth_path: pathlib.Path, prediction_path: pathlib.Path
+    truth_path: pathlib.Path,
+    prediction_path: pathlib.Path,
+    cache_path: Optional[pathlib.Path] = None,
+    max_workers: Optional[int] = 1,
 ) -> Generator[ImagePair, None, None]:
+    """
+    Iterate over loaded image pairs, in order of their ground truth file names.
+
+    If max_workers is greater than 1, image pairs are loaded in that many parallel processes, or
+    one per available CPU if it's None. Worker processes are not forked, so scripts using them
+    must guard their entry point with "if __name__ == '__main__'".
+    """
+    # List the prediction files only once, instead of for each truth file
+    prediction_file_index = index_prediction_files(prediction_path)
+
+    image_pairs: List[ImagePair] = []
     for truth_file in sorted(truth_path.iterdir()):
         if truth_file.name in {'ATTRIBUTION.txt', 'LICENSE.txt'}:
             continue
 
         image_pair = ImagePair(truth_file=truth_file)
         image_pair.parse_image_id()
-        image_pair.find_prediction_file(prediction_path)
-        image_pair.load_truth_image()
-        image_pair.load_prediction_image()
-
-        yield image_pair
+        image_pair.find_prediction_file(prediction_file_index)
+        image_pairs.append(image_pair)
+
+    if max_workers is None:
+        max_workers = _available_cpu_count()
+
+    if max_workers <= 1:
+        for image_pair in image_pairs:
+            yield _load_image_pair(image_pair, cache_path)
+        return
+
+    # Image pairs are independent, so decode them in parallel processes; these must not be forked
+    # from this process, since forking after the Numba kernel's threads have started can deadlock
+    start_method = (
+        'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    )
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context(start_method)
+    ) as executor:
+        pending_image_pairs: Deque[Future] = deque()
+        for image_pair in image_pairs:
+            pending_image_pairs.append(executor.submit(_load_image_pair, image_pair, cache_path))
+            # Bound the number of loaded images which may be waiting in memory
+            if len(pending_image_pairs) >= 2 * max_workers:
+                yield pending_image_pairs.popleft().result()
+
+        while pending_image_pairs:
+            yield pending_image_pairs.popleft().result()
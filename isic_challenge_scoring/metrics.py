@@ -1,3 +1,4 @@
+from typing import Tuple
 import warnings
 
 import numpy as np
@@ -12,8 +13,9 @@ def _to_labels(probabilities: pd.DataFrame) -> pd.Series:
     # Find places where there are multiple maximum values
     max_probabilities = probabilities.max(axis='columns')
     is_max: pd.DataFrame = probabilities.eq(max_probabilities, axis='rows')
-    number_of_max: pd.Series = is_max.sum(axis='columns')
-    multiple_max: pd.Series = number_of_max.gt(1)
+    # Unlike summing, counting boolean values doesn't need to upcast them to integers
+    number_of_max: np.ndarray = np.count_nonzero(is_max.to_numpy(), axis=1)
+    multiple_max: np.ndarray = number_of_max > 1
     # Set those locations as an 'undecided' label
     labels[multiple_max] = 'undecided'
     # TODO: emit a warning if any are set to 'undecided'
@@ -111,6 +113,12 @@ def binary_dice(cm: pd.Series) -> float:
         return (2 * cm.at['TP']) / ((2 * cm.at['TP']) + cm.at['FP'] + cm.at['FN'])
 
 
+def jaccard_to_dice(jaccard: pd.Series) -> pd.Series:
+    # This relationship holds for any confusion matrix, including the ill-defined case where both
+    # are scored as 1.0
+    return (2 * jaccard) / (1 + jaccard)
+
+
 def binary_ppv(cm: pd.Series) -> float:
     if cm.at['TP'] + cm.at['FP'] == 0:
         # PPV is ill-defined if all predictions are negative; we'll score it as perfect, which
@@ -136,7 +144,7 @@ def binary_npv(cm: pd.Series) -> float:
 
 
 def auc(
-    truth_probabilities: pd.Series, prediction_probabilities: pd.Series, weights: pd.Series
+    truth_probabilities: np.ndarray, prediction_probabilities: np.ndarray, weights: np.ndarray
 ) -> float:
     auc = sklearn.metrics.roc_auc_score(
         truth_probabilities, prediction_probabilities, sample_weight=weights
@@ -145,9 +153,9 @@ def auc(
 
 
 def auc_above_sensitivity(
-    truth_probabilities: pd.Series,
-    prediction_probabilities: pd.Series,
-    weights: pd.Series,
+    truth_probabilities: np.ndarray,
+    prediction_probabilities: np.ndarray,
+    weights: np.ndarray,
     sensitivity_threshold: float,
 ) -> float:
     if not (0 < sensitivity_threshold <= 1.0):
@@ -162,6 +170,45 @@ def auc_above_sensitivity(
         drop_intermediate=False,
     )
 
+    return _partial_auc_above_sensitivity(fp_rates, tp_rates, sensitivity_threshold)
+
+
+def auc_and_auc_above_sensitivity(
+    truth_probabilities: np.ndarray,
+    prediction_probabilities: np.ndarray,
+    weights: np.ndarray,
+    sensitivity_threshold: float,
+) -> Tuple[float, float]:
+    """Compute both the AUC and the partial AUC above a sensitivity, from a single ROC curve."""
+    if not (0 < sensitivity_threshold <= 1.0):
+        raise Exception(f'Out of bounds sensitivity_threshold: {sensitivity_threshold}.')
+    if truth_probabilities.min() == truth_probabilities.max():
+        # Match the failure of sklearn.metrics.roc_auc_score, since sklearn.metrics.roc_curve
+        # only warns; unlike np.unique, this does not need to sort the values
+        raise ValueError(
+            'Only one class present in y_true. ROC AUC score is not defined in that case.'
+        )
+
+    # Computing the ROC curve (which sorts all predictions) once and sharing it is about twice as
+    # fast as computing each metric independently
+    fp_rates, tp_rates, thresholds = sklearn.metrics.roc_curve(
+        truth_probabilities,
+        prediction_probabilities,
+        sample_weight=weights,
+        drop_intermediate=False,
+    )
+
+    # This is mathematically the same as sklearn.metrics.roc_auc_score, as dropping intermediate
+    # collinear points does not change the area under the curve; however, since the trapezoids
+    # are summed over more points, the result may differ from it in the last unit of precision
+    auc = sklearn.metrics.auc(fp_rates, tp_rates)
+    partial_auc = _partial_auc_above_sensitivity(fp_rates, tp_rates, sensitivity_threshold)
+    return auc, partial_auc
+
+
+def _partial_auc_above_sensitivity(
+    fp_rates: np.ndarray, tp_rates: np.ndarray, sensitivity_threshold: float
+) -> float:
     # Calling sklearn.metrics.roc_auc_score with max_fpr always applies the McClish correction,
     # which is a transform to normalize partial AUC values into the range [0.5, 1] (for a given FPR
     # interval): http://www.ncbi.nlm.nih.gov/pubmed/2668680
@@ -204,7 +251,7 @@ def auc_above_sensitivity(
 
 
 def average_precision(
-    truth_probabilities: pd.Series, prediction_probabilities: pd.Series, weights: pd.Series
+    truth_probabilities: np.ndarray, prediction_probabilities: np.ndarray, weights: np.ndarray
 ) -> float:
     with warnings.catch_warnings():
         # sklearn.metrics.average_precision_score sometimes causes warnings internally, but they
@@ -219,7 +266,7 @@ def average_precision(
 
 
 def roc(
-    truth_probabilities: pd.Series, prediction_probabilities: pd.Series, weights: pd.Series
+    truth_probabilities: np.ndarray, prediction_probabilities: np.ndarray, weights: np.ndarray
 ) -> pd.DataFrame:
     fprs, tprs, thresholds = sklearn.metrics.roc_curve(
         truth_probabilities, prediction_probabilities, sample_weight=weights
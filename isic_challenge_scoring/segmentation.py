@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import pathlib
-from typing import cast, Iterable
+from typing import cast, Iterable, Optional
 
 import pandas as pd
 
 from isic_challenge_scoring import metrics
-from isic_challenge_scoring.confusion import create_binary_confusion_matrix
+from isic_challenge_scoring.confusion import create_thresholded_confusion_matrix
 from isic_challenge_scoring.load_image import ImagePair, iter_image_pairs
 from isic_challenge_scoring.types import Score, ScoreDict, SeriesDict
 from isic_challenge_scoring.unzip import unzip_all
@@ -21,25 +21,29 @@ class SegmentationScore(Score):
         # TODO: Add weighting
         confusion_matrics = pd.DataFrame(
             [
-                create_binary_confusion_matrix(
-                    truth_binary_values=image_pair.truth_image > 128,
-                    prediction_binary_values=image_pair.prediction_image > 128,
+                create_thresholded_confusion_matrix(
+                    truth_values=image_pair.truth_image,
+                    prediction_values=image_pair.prediction_image,
+                    threshold=128,
                     name=image_pair.image_id,
                 )
                 for image_pair in image_pairs
             ]
         )
 
+        jaccard = confusion_matrics.apply(metrics.binary_jaccard, axis='columns')
+
         per_image = pd.DataFrame(
             {
                 'accuracy': confusion_matrics.apply(metrics.binary_accuracy, axis='columns'),
                 'sensitivity': confusion_matrics.apply(metrics.binary_sensitivity, axis='columns'),
                 'specificity': confusion_matrics.apply(metrics.binary_specificity, axis='columns'),
-                'jaccard': confusion_matrics.apply(metrics.binary_jaccard, axis='columns'),
+                'jaccard': jaccard,
                 'threshold_jaccard': confusion_matrics.apply(
                     metrics.binary_threshold_jaccard, threshold=0.65, axis='columns'
                 ),
-                'dice': confusion_matrics.apply(metrics.binary_dice, axis='columns'),
+                # Dice is exactly 2J / (1 + J) for Jaccard J, so it's computed directly from it
+                'dice': metrics.jaccard_to_dice(jaccard),
             },
             columns=[
                 'accuracy',
@@ -68,13 +72,23 @@ class SegmentationScore(Score):
         return output
 
     @classmethod
-    def from_dir(cls, truth_path: pathlib.Path, prediction_path: pathlib.Path) -> SegmentationScore:
-        image_pairs = iter_image_pairs(truth_path, prediction_path)
+    def from_dir(
+        cls,
+        truth_path: pathlib.Path,
+        prediction_path: pathlib.Path,
+        cache_path: Optional[pathlib.Path] = None,
+        max_workers: Optional[int] = 1,
+    ) -> SegmentationScore:
+        image_pairs = iter_image_pairs(truth_path, prediction_path, cache_path, max_workers)
         return cls(image_pairs)
 
     @classmethod
     def from_zip_file(
-        cls, truth_zip_file: pathlib.Path, prediction_zip_file: pathlib.Path
+        cls,
+        truth_zip_file: pathlib.Path,
+        prediction_zip_file: pathlib.Path,
+        cache_path: Optional[pathlib.Path] = None,
+        max_workers: Optional[int] = 1,
     ) -> SegmentationScore:
         truth_path, truth_temp_dir = unzip_all(truth_zip_file)
         # TODO: If an exception occurs while unzipping prediction_zip_file, truth_temp_dir is not
@@ -82,7 +96,7 @@ class SegmentationScore(Score):
         prediction_path, prediction_temp_dir = unzip_all(prediction_zip_file)
 
         try:
-            score = cls.from_dir(truth_path, prediction_path)
+            score = cls.from_dir(truth_path, prediction_path, cache_path, max_workers)
         finally:
             truth_temp_dir.cleanup()
             prediction_temp_dir.cleanup()
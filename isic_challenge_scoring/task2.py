@@ -5,7 +5,7 @@ import pandas as pd
 
 from isic_challenge_scoring import metrics
 from isic_challenge_scoring.confusion import (
-    create_binary_confusion_matrix,
+    create_thresholded_confusion_matrix,
     normalize_confusion_matrix,
 )
 from isic_challenge_scoring.load_image import iter_image_pairs
@@ -14,9 +14,10 @@ from isic_challenge_scoring.load_image import iter_image_pairs
 def score(truth_path: pathlib.Path, prediction_path: pathlib.Path):
     confusion_matrics = pd.DataFrame(
         [
-            create_binary_confusion_matrix(
-                truth_binary_values=image_pair.truth_image > 128,
-                prediction_binary_values=image_pair.prediction_image > 128,
+            create_thresholded_confusion_matrix(
+                truth_values=image_pair.truth_image,
+                prediction_values=image_pair.prediction_image,
+                threshold=128,
                 name=(cast(str, image_pair.attribute_id), image_pair.image_id),
             )
             for image_pair in iter_image_pairs(truth_path, prediction_path)
@@ -57,6 +57,7 @@ setup(
         'scipy',
         'scikit-learn',
     ],
+    extras_require={'numba': ['numba'], 'opencv': ['opencv-python-headless']},
     use_scm_version={'local_scheme': prerelease_local_scheme},
     entry_points="""
         [console_scripts]
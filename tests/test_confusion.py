@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from isic_challenge_scoring import confusion
+from isic_challenge_scoring.confusion import (
+    create_binary_confusion_matrices,
+    create_binary_confusion_matrix,
+    create_thresholded_confusion_matrix,
+)
+
+
+@pytest.fixture(autouse=True, params=['numba', 'numpy'])
+def counting_implementation(request, monkeypatch):
+    # Test both the Numba kernel and the NumPy fallback, regardless of which is installed
+    if request.param == 'numba':
+        if confusion.numba is None:
+            pytest.skip('Numba is not installed.')
+    else:
+        monkeypatch.setattr(confusion, 'numba', None)
+
+
+@pytest.fixture
+def truth_binary_values() -> np.ndarray:
+    return np.array([True, True, True, False, False, False, False, True])
+
+
+@pytest.fixture
+def prediction_binary_values() -> np.ndarray:
+    return np.array([True, False, True, True, False, False, True, False])
+
+
+def test_create_binary_confusion_matrix(truth_binary_values, prediction_binary_values):
+    cm = create_binary_confusion_matrix(truth_binary_values, prediction_binary_values, name='foo')
+
+    assert cm.to_dict() == {'TP': 2, 'TN': 2, 'FP': 2, 'FN': 2}
+    assert cm.name == 'foo'
+
+
+def test_create_binary_confusion_matrix_float(truth_binary_values, prediction_binary_values):
+    cm = create_binary_confusion_matrix(
+        truth_binary_values.astype(np.float64), prediction_binary_values.astype(np.float64)
+    )
+
+    assert cm.to_dict() == {'TP': 2, 'TN': 2, 'FP': 2, 'FN': 2}
+
+
+def test_create_binary_confusion_matrix_weighted(truth_binary_values, prediction_binary_values):
+    weights = np.array([1.0, 0.5, 0.0, 2.0, 1.0, 0.25, 0.0, 1.0])
+
+    cm = create_binary_confusion_matrix(truth_binary_values, prediction_binary_values, weights)
+
+    assert cm.to_dict() == {'TP': 1.0, 'TN': 1.25, 'FP': 2.0, 'FN': 1.5}
+
+
+def test_create_binary_confusion_matrix_2d(truth_binary_values, prediction_binary_values):
+    cm = create_binary_confusion_matrix(
+        truth_binary_values.reshape(2, 4), prediction_binary_values.reshape(2, 4)
+    )
+
+    assert cm.to_dict() == {'TP': 2, 'TN': 2, 'FP': 2, 'FN': 2}
+
+
+def test_create_thresholded_confusion_matrix():
+    truth_values = np.array([[0, 255, 129, 128], [255, 0, 0, 255]], dtype=np.uint8)
+    prediction_values = np.array([[255, 255, 0, 255], [128, 0, 200, 0]], dtype=np.uint8)
+
+    cm = create_thresholded_confusion_matrix(truth_values, prediction_values, 128, name='foo')
+
+    assert cm.to_dict() == {'TP': 1, 'TN': 1, 'FP': 3, 'FN': 3}
+    assert cm.name == 'foo'
+
+
+@pytest.mark.parametrize(
+    'weights',
+    [None, np.array([1.0, 0.5, 0.0, 2.0, 1.0, 0.25, 0.0, 1.0])],
+    ids=['unweighted', 'weighted'],
+)
+def test_create_binary_confusion_matrices(truth_binary_values, prediction_binary_values, weights):
+    names = pd.Index(['foo', 'bar'])
+
+    cms = create_binary_confusion_matrices(
+        np.stack([truth_binary_values, ~truth_binary_values], axis=1),
+        np.stack([prediction_binary_values, prediction_binary_values], axis=1),
+        weights,
+        names,
+    )
+
+    assert cms.index.equals(names)
+    for name, column_truth_binary_values in [
+        ('foo', truth_binary_values),
+        ('bar', ~truth_binary_values),
+    ]:
+        cm = create_binary_confusion_matrix(
+            column_truth_binary_values, prediction_binary_values, weights
+        )
+        assert cms.loc[name].to_dict() == cm.to_dict()
@@ -259,6 +259,21 @@ def test_parse_csv_non_float_columns(categories):
     )
 
 
+def test_parse_csv_non_float_columns_with_missing_values(categories):
+    prediction_file_stream = io.StringIO(
+        'image,MEL,NV,BCC,AKIEC,BKL,DF,VASC\n'
+        'ISIC_0000123,1.0,0.0,0.0,0.0,0.0,0.0,0.0\n'
+        "ISIC_0000124,0.0,1.0,0.0,0.0,0.0,0.0,'BAD'\n"
+        'ISIC_0000125,0.0,0.0,1.0,0.0,0.0,0.0,\n'
+    )
+
+    with pytest.raises(ScoreException) as exc_info:
+        load_csv.parse_csv(prediction_file_stream, categories)
+
+    # Non-floating-point values are reported before missing values
+    assert "CSV contains non-floating-point value(s) in columns: ['VASC']." == str(exc_info.value)
+
+
 def test_parse_csv_out_of_range_values(categories):
     prediction_file_stream = io.StringIO(
         'image,MEL,NV,BCC,AKIEC,BKL,DF,VASC\n'
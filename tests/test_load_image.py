@@ -1,5 +1,12 @@
+import os
 import pathlib
+import stat
+import subprocess
+import sys
+import textwrap
 
+import numpy as np
+from PIL import Image
 import pytest
 
 from isic_challenge_scoring import load_image, ScoreException
@@ -45,3 +52,278 @@ def test_load_segmentation_image_invalid(test_images_path, test_image_name):
     image_path = test_images_path / test_image_name
     with pytest.raises(ScoreException):
         load_image.load_segmentation_image(image_path)
+
+
+@pytest.mark.parametrize(
+    'image',
+    [
+        np.array([[0, 255], [255, 0]], dtype=np.uint8),
+        np.array([[0, 0], [0, 0]], dtype=np.uint8),
+        np.array([[255, 255], [255, 255]], dtype=np.uint8),
+    ],
+)
+def test_assert_binary_image_valid(image):
+    binary_image = load_image.assert_binary_image(image.copy(), pathlib.Path('/foo.png'))
+
+    assert np.array_equal(binary_image, image)
+
+
+@pytest.mark.parametrize('high_value', [1, 127, 128, 254])
+def test_assert_binary_image_rescaled(high_value):
+    image = np.array([[0, high_value], [high_value, 0]], dtype=np.uint8)
+
+    binary_image = load_image.assert_binary_image(image, pathlib.Path('/foo.png'))
+
+    assert binary_image.dtype == np.uint8
+    assert np.array_equal(binary_image, np.array([[0, 255], [255, 0]], dtype=np.uint8))
+
+
+@pytest.mark.parametrize(
+    'image',
+    [
+        np.array([[0, 255], [128, 0]], dtype=np.uint8),
+        np.array([[0, 1], [2, 0]], dtype=np.uint8),
+        np.array([[5, 200], [200, 5]], dtype=np.uint8),
+    ],
+)
+def test_assert_binary_image_invalid(image):
+    with pytest.raises(ScoreException):
+        load_image.assert_binary_image(image, pathlib.Path('/foo.png'))
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_iter_image_pairs(tmp_path, max_workers):
+    truth_path = tmp_path / 'truth'
+    prediction_path = tmp_path / 'prediction'
+    truth_path.mkdir()
+    prediction_path.mkdir()
+    (truth_path / 'LICENSE.txt').touch()
+    for image_number in ['0000002', '0000001', '0000003']:
+        image = np.zeros((4, 6), dtype=np.uint8)
+        image[:, int(image_number[-1]) :] = 255
+        Image.fromarray(image).save(truth_path / f'ISIC_{image_number}_segmentation.png')
+        Image.fromarray(255 - image).save(prediction_path / f'ISIC_{image_number}.png')
+
+    image_pairs = list(load_image.iter_image_pairs(truth_path, prediction_path, None, max_workers))
+
+    assert [image_pair.image_id for image_pair in image_pairs] == [
+        'ISIC_0000001',
+        'ISIC_0000002',
+        'ISIC_0000003',
+    ]
+    for image_pair in image_pairs:
+        assert image_pair.prediction_file.name == f'{image_pair.image_id}.png'
+        assert image_pair.truth_image.shape == (4, 6)
+        assert image_pair.truth_image[0, -1] == 255
+
+
+def test_iter_image_pairs_after_counting_kernel(tmp_path):
+    truth_path = tmp_path / 'truth'
+    prediction_path = tmp_path / 'prediction'
+    truth_path.mkdir()
+    prediction_path.mkdir()
+    for image_number in ['0000001', '0000002']:
+        image = np.zeros((4, 6), dtype=np.uint8)
+        Image.fromarray(image).save(truth_path / f'ISIC_{image_number}.png')
+        Image.fromarray(image).save(prediction_path / f'ISIC_{image_number}.png')
+
+    # Worker processes must be started safely after the (possibly parallel) counting kernel has run
+    # in the same process; a deadlock typically only occurs at exit, so run this in a subprocess
+    script = textwrap.dedent(
+        f"""
+        import pathlib
+
+        from isic_challenge_scoring.confusion import create_thresholded_confusion_matrix
+        from isic_challenge_scoring.load_image import iter_image_pairs
+
+        for _ in range(2):
+            for image_pair in iter_image_pairs(
+                pathlib.Path({str(truth_path)!r}),
+                pathlib.Path({str(prediction_path)!r}),
+                max_workers=2,
+            ):
+                create_thresholded_confusion_matrix(
+                    image_pair.truth_image, image_pair.prediction_image, 128
+                )
+        """
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, timeout=120)
+
+
+def test_iter_image_pairs_serial(tmp_path, monkeypatch):
+    truth_path = tmp_path / 'truth'
+    prediction_path = tmp_path / 'prediction'
+    truth_path.mkdir()
+    prediction_path.mkdir()
+    image = np.zeros((4, 6), dtype=np.uint8)
+    Image.fromarray(image).save(truth_path / 'ISIC_0000001.png')
+    Image.fromarray(image).save(prediction_path / 'ISIC_0000001.png')
+
+    # By default, no worker processes should be started, so callers don't need to support them
+    def no_process_pool(*args, **kwargs):
+        raise AssertionError('A process pool was started.')
+
+    monkeypatch.setattr(load_image, 'ProcessPoolExecutor', no_process_pool)
+
+    image_pairs = list(load_image.iter_image_pairs(truth_path, prediction_path))
+
+    assert [image_pair.image_id for image_pair in image_pairs] == ['ISIC_0000001']
+
+
+def test_iter_image_pairs_missing_prediction(tmp_path):
+    truth_path = tmp_path / 'truth'
+    prediction_path = tmp_path / 'prediction'
+    truth_path.mkdir()
+    prediction_path.mkdir()
+    Image.fromarray(np.zeros((4, 6), dtype=np.uint8)).save(truth_path / 'ISIC_0000001.png')
+
+    with pytest.raises(ScoreException):
+        list(load_image.iter_image_pairs(truth_path, prediction_path))
+
+
+def test_index_prediction_files(tmp_path):
+    for prediction_file_name in [
+        'ISIC_0000001.png',
+        'ISIC_0000002_attribute_streaks.png',
+        'ISIC_0000002_attribute_globules.png',
+        'foo_123456789.png',
+        'bar.png',
+    ]:
+        (tmp_path / prediction_file_name).touch()
+
+    prediction_file_index = load_image.index_prediction_files(tmp_path)
+
+    assert prediction_file_index['0000001'] == [tmp_path / 'ISIC_0000001.png']
+    assert sorted(prediction_file_index['0000002']) == [
+        tmp_path / 'ISIC_0000002_attribute_globules.png',
+        tmp_path / 'ISIC_0000002_attribute_streaks.png',
+    ]
+    for image_number in ['1234567', '2345678', '3456789']:
+        assert prediction_file_index[image_number] == [tmp_path / 'foo_123456789.png']
+
+
+@pytest.mark.parametrize(
+    'truth_file, correct_prediction_file',
+    [
+        ('ISIC_0000001.png', 'ISIC_0000001.png'),
+        ('ISIC_0000002_attribute_streaks.png', 'ISIC_0000002_attribute_streaks.png'),
+    ],
+)
+def test_find_prediction_file_valid(truth_file, correct_prediction_file):
+    prediction_file_index = {
+        '0000001': [pathlib.Path('/ISIC_0000001.png')],
+        '0000002': [
+            pathlib.Path('/ISIC_0000002_attribute_globules.png'),
+            pathlib.Path('/ISIC_0000002_attribute_streaks.png'),
+        ],
+    }
+    image_pair = load_image.ImagePair(truth_file=pathlib.Path(truth_file))
+    image_pair.parse_image_id()
+
+    image_pair.find_prediction_file(prediction_file_index)
+
+    assert image_pair.prediction_file == pathlib.Path('/') / correct_prediction_file
+
+
+@pytest.mark.parametrize(
+    'truth_file', ['ISIC_0000002.png', 'ISIC_0000003.png', 'ISIC_0000002_attribute_milia.png']
+)
+def test_find_prediction_file_invalid(truth_file):
+    prediction_file_index = {
+        '0000002': [
+            pathlib.Path('/ISIC_0000002_attribute_globules.png'),
+            pathlib.Path('/ISIC_0000002_attribute_streaks.png'),
+        ],
+    }
+    image_pair = load_image.ImagePair(truth_file=pathlib.Path(truth_file))
+    image_pair.parse_image_id()
+
+    with pytest.raises(ScoreException):
+        image_pair.find_prediction_file(prediction_file_index)
+
+
+def test_load_cached_segmentation_image(tmp_path):
+    image_path = tmp_path / 'ISIC_0000001.png'
+    cache_path = tmp_path / 'cache'
+    cache_path.mkdir()
+    image = np.zeros((4, 6), dtype=np.uint8)
+    image[:, 3:] = 255
+    Image.fromarray(image).save(image_path)
+
+    uncached_image = load_image.load_cached_segmentation_image(image_path, cache_path)
+    cached_image = load_image.load_cached_segmentation_image(image_path, cache_path)
+
+    assert len(list(cache_path.iterdir())) == 1
+    assert np.array_equal(uncached_image, image)
+    assert np.array_equal(cached_image, image)
+
+
+def test_load_cached_segmentation_image_corrupt(tmp_path):
+    image_path = tmp_path / 'ISIC_0000001.png'
+    cache_path = tmp_path / 'cache'
+    cache_path.mkdir()
+    image = np.zeros((4, 6), dtype=np.uint8)
+    image[:, 3:] = 255
+    Image.fromarray(image).save(image_path)
+    load_image.load_cached_segmentation_image(image_path, cache_path)
+    (cached_image_path,) = cache_path.iterdir()
+    cached_image_path.write_bytes(cached_image_path.read_bytes()[:-4])
+
+    cached_image = load_image.load_cached_segmentation_image(image_path, cache_path)
+
+    assert np.array_equal(cached_image, image)
+    assert list(cache_path.iterdir()) == [cached_image_path]
+    assert np.array_equal(np.load(cached_image_path), image)
+
+
+def test_load_cached_segmentation_image_save_error(tmp_path, monkeypatch):
+    image_path = tmp_path / 'ISIC_0000001.png'
+    cache_path = tmp_path / 'cache'
+    cache_path.mkdir()
+    Image.fromarray(np.zeros((4, 6), dtype=np.uint8)).save(image_path)
+
+    def failing_save(file, arr):
+        file.write(b'partial')
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(np, 'save', failing_save)
+
+    with pytest.raises(OSError):
+        load_image.load_cached_segmentation_image(image_path, cache_path)
+
+    assert list(cache_path.iterdir()) == []
+
+
+def test_load_cached_segmentation_image_permissions(tmp_path):
+    image_path = tmp_path / 'ISIC_0000001.png'
+    cache_path = tmp_path / 'cache'
+    cache_path.mkdir()
+    Image.fromarray(np.zeros((4, 6), dtype=np.uint8)).save(image_path)
+    umask = os.umask(0o022)
+
+    try:
+        load_image.load_cached_segmentation_image(image_path, cache_path)
+    finally:
+        os.umask(umask)
+
+    (cached_image_path,) = cache_path.iterdir()
+    assert stat.S_IMODE(cached_image_path.stat().st_mode) == 0o644
+
+
+def test_load_cached_segmentation_image_unreadable(tmp_path, monkeypatch):
+    image_path = tmp_path / 'ISIC_0000001.png'
+    cache_path = tmp_path / 'cache'
+    cache_path.mkdir()
+    image = np.zeros((4, 6), dtype=np.uint8)
+    image[:, 3:] = 255
+    Image.fromarray(image).save(image_path)
+    load_image.load_cached_segmentation_image(image_path, cache_path)
+
+    def unreadable_load(file):
+        raise PermissionError(f'Permission denied: {file}')
+
+    monkeypatch.setattr(np, 'load', unreadable_load)
+
+    cached_image = load_image.load_cached_segmentation_image(image_path, cache_path)
+
+    assert np.array_equal(cached_image, image)
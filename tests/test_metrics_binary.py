@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 import pytest
 
 from isic_challenge_scoring import metrics
@@ -210,6 +211,29 @@ def test_binary_dice(truth_binary_image, prediction_binary_image, correct_value)
     assert value == correct_value
 
 
+@pytest.mark.parametrize(
+    'truth_binary_image, prediction_binary_image',
+    [
+        (truth_binary_image, empty_overlap_prediction_binary_image),
+        (truth_binary_image, no_overlap_prediction_binary_image),
+        (truth_binary_image, quarter_overlap_prediction_binary_image),
+        (truth_binary_image, half_overlap_prediction_binary_image),
+        (truth_binary_image, half_filled_prediction_binary_image),
+        (truth_binary_image, three_quarter_filled_prediction_binary_image),
+        (truth_binary_image, truth_binary_image),
+        (truth_binary_image, one_extra_prediction_binary_image),
+        (truth_binary_image, filled_prediction_binary_image),
+        (empty_overlap_prediction_binary_image, empty_overlap_prediction_binary_image),
+    ],
+)
+def test_jaccard_to_dice(truth_binary_image, prediction_binary_image):
+    cm = create_binary_confusion_matrix(truth_binary_image, prediction_binary_image)
+
+    value = metrics.jaccard_to_dice(pd.Series([metrics.binary_jaccard(cm)]))
+
+    assert value.iloc[0] == pytest.approx(metrics.binary_dice(cm))
+
+
 @pytest.mark.parametrize(
     'truth_binary_image, prediction_binary_image, correct_value',
     [
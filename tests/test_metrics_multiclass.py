@@ -119,6 +119,45 @@ def test_auc_above_sensitivity(
     assert value == correct_value
 
 
+@pytest.mark.parametrize(
+    'truth_probabilities, prediction_probabilities',
+    [
+        ([0.0, 0.0, 1.0, 1.0], [0.2, 0.4, 0.6, 0.8]),
+        ([0.0, 0.0, 1.0, 1.0], [0.3, 0.7, 0.3, 0.7]),
+        ([0.0, 0.0, 1.0, 1.0], [0.8, 0.6, 0.4, 0.2]),
+        ([0.0, 1.0, 0.0, 1.0, 1.0, 0.0], [0.1, 0.9, 0.6, 0.6, 0.3, 0.2]),
+    ],
+)
+@pytest.mark.parametrize('sensitivity_threshold', [0.1, 0.8, 1.0])
+def test_auc_and_auc_above_sensitivity(
+    truth_probabilities, prediction_probabilities, sensitivity_threshold
+):
+    truth_probabilities = pd.Series(truth_probabilities)
+    prediction_probabilities = pd.Series(prediction_probabilities)
+    weights = pd.Series([1.0] * len(truth_probabilities))
+
+    auc, partial_auc = metrics.auc_and_auc_above_sensitivity(
+        truth_probabilities, prediction_probabilities, weights, sensitivity_threshold
+    )
+
+    assert auc == pytest.approx(metrics.auc(truth_probabilities, prediction_probabilities, weights))
+    assert partial_auc == metrics.auc_above_sensitivity(
+        truth_probabilities, prediction_probabilities, weights, sensitivity_threshold
+    )
+
+
+@pytest.mark.parametrize('truth_value', [0.0, 1.0])
+def test_auc_and_auc_above_sensitivity_one_class(truth_value):
+    truth_probabilities = pd.Series([truth_value] * 4)
+    prediction_probabilities = pd.Series([0.1, 0.4, 0.35, 0.8])
+    weights = pd.Series([1.0] * 4)
+
+    with pytest.raises(ValueError, match='Only one class present'):
+        metrics.auc_and_auc_above_sensitivity(
+            truth_probabilities, prediction_probabilities, weights, 0.8
+        )
+
+
 @pytest.mark.parametrize(
     'truth_probabilities, prediction_probabilities, correct_roc',
     [